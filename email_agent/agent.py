@@ -2,13 +2,16 @@ from langchain.agents import create_agent
 from langchain.tools import tool
 from langchain_core.messages import HumanMessage, ToolMessage
 from langchain.agents.middleware import HumanInTheLoopMiddleware
-from langgraph.checkpoint.memory import InMemorySaver
 from langgraph.types import Command
+from operator import itemgetter
 import sys
 import os
 
 sys.path.append(os.path.abspath(os.path.join(os.getcwd(), '.')))
 from config import model
+from shared.approval import APPROVE_REJECT, BANNER, decide
+from shared.checkpoint import SessionSaver
+from shared.streaming import stream_agent
 
 @tool
 def read_email() -> str:
@@ -34,38 +37,36 @@ agent = create_agent(
             interrupt_on={"send_email": {"allowed_decisions": ["approve", "reject"]}},
         ),
     ],
-    checkpointer=InMemorySaver(),
+    checkpointer=SessionSaver(),
     system_prompt="You're an AI assistant that helps manage emails and meetings.",
 )
 
+_EMPTY_EMAIL = {'recipient': '', 'subject': '', 'body': ''}
+_get_email_fields = itemgetter('recipient', 'subject', 'body')
+
 def get_user_decision(received_email: str, email: str) -> str:
     """Interactive terminal prompt for approval."""
     
     print(f"\nLATEST EMAIL IN INBOX:") 
     print(f"\n{received_email}")
-    print(f"\n{'='*100}")
+    print(f"\n{BANNER}")
     print(f"APPROVAL REQUIRED - EMAIL SEND OPERATION")
-    print(f"{'='*100}")
+    print(f"{BANNER}")
     print(f"Email to send:\n{email}")
-    print(f"{'='*100}")
+    print(f"{BANNER}")
     
     print("\nOptions:")
     print("  [a] Approve  - Send the email")
     print("  [r] Reject   - Cancel the email")
     
-    while True:
-        decision = input("\nYour decision: ").strip().lower()
-        
-        if decision in ['a', 'approve', 'yes', 'y']:
-            print(f"\nEmail approved, executing...\n")
-            return 'approve'
-        
-        elif decision in ['r', 'reject', 'no', 'n']:
-            print(f"\nEmail rejected\n")
-            return 'reject'
-        
-        else:
-            print("Invalid input. Please choose: [a]pprove or [r]eject")
+    decision = decide("Invalid input. Please choose: [a]pprove or [r]eject", APPROVE_REJECT)
+
+    if decision == 'approve':
+        print(f"\nEmail approved, executing...\n")
+    else:
+        print(f"\nEmail rejected\n")
+
+    return decision
 
 
 def main():
@@ -75,36 +76,37 @@ def main():
 
     print("Starting Email Agent...\n")
 
-    result = agent.invoke(
+    result = stream_agent(
+        agent,
         {"messages": [HumanMessage(content=prompt)]},
         config=config,
+        durability="exit",
     )
 
     while "__interrupt__" in result:
         action_request = result['__interrupt__'][-1].value['action_requests'][-1]
-        recipient = action_request['args'].get('recipient', '')
-        subject = action_request['args'].get('subject', '')
-        body = action_request['args'].get('body', '')
+        recipient, subject, body = _get_email_fields({**_EMPTY_EMAIL, **action_request['args']})
         email = f"To: {recipient}\nSubject: {subject}\n\n{body}"
-        received_email = ""
-        for message in result.get('messages', []):
-            if isinstance(message, ToolMessage) and message.name == 'read_email':
-                received_email = message.content
-                break
+        received_email = next(
+            (
+                message.content
+                for message in reversed(result.get('messages', []))
+                if isinstance(message, ToolMessage) and message.name == 'read_email'
+            ),
+            "",
+        )
         
         decision = get_user_decision(received_email, email)
 
-        result = agent.invoke(
+        result = stream_agent(
+            agent,
             Command(resume={"decisions": [{"type": decision}]}),
             config=config,
+            durability="exit",
         )
 
     print("\nEmail Agent finished!")
 
-    if result and result["messages"]:
-        print("\n--- Final Result ---")
-        print(result["messages"][-1].content)
-
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
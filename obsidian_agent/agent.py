@@ -1,49 +1,145 @@
 import os
-from typing import Any, Dict, List
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 from langchain.agents import create_agent
 from langchain.tools import tool
 from langchain_core.messages import HumanMessage
 from langchain.agents.middleware import HumanInTheLoopMiddleware
-from langgraph.checkpoint.memory import InMemorySaver
-from langchain_community.document_loaders import ObsidianLoader
-from tavily import TavilyClient
+import requests
 from langgraph.types import Command
 from pathlib import Path
 import sys
 
 sys.path.append(os.path.abspath(os.path.join(os.getcwd(), '.')))
 from config import model
+from shared.approval import APPROVE_REJECT, BANNER, decide
+from shared.checkpoint import SessionSaver
+from shared.streaming import stream_agent
+
+if TYPE_CHECKING:
+    from tavily import TavilyClient
 
-tavily_client = TavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
 vault_path = Path(__file__).parent / "obsidian"
 
 
-_notes_cache = None
+_cache_path = vault_path / ".notes_cache.pkl"
+_notes_cache: Optional[Dict[str, Tuple[int, int, str, str]]] = None
+_cache_dirty = False
+
+def _read_cache_file() -> Dict[str, Tuple[int, int, str, str]]:
+    """Read the on-disk notes snapshot, or an empty one if it is missing or unreadable"""
+
+    try:
+        with _cache_path.open("rb") as f:
+            cache = pickle.load(f)
+    except Exception:
+        return {}
+
+    if not isinstance(cache, dict):
+        return {}
+
+    return {
+        name: entry
+        for name, entry in cache.items()
+        if isinstance(entry, tuple) and len(entry) == 4
+    }
+
+def _write_cache_file(cache: Dict[str, Tuple[int, int, str, str]]) -> None:
+    """Persist the notes snapshot next to the vault"""
+
+    try:
+        with _cache_path.open("wb") as f:
+            pickle.dump(cache, f, protocol=5)
+    except OSError:
+        pass
 
 def load_notes(force_reload: bool = False) -> List[Dict[str, str]]:
-    """Load personal notes from Obsidian vault with caching"""
+    """Load personal notes from Obsidian vault, re-reading only files changed since the last load"""
 
-    global _notes_cache
-    
-    if _notes_cache is None or force_reload:
-        loader = ObsidianLoader(str(vault_path))
-        docs = loader.load()
-        
-        _notes_cache = [
-            {
-                "title": Path(doc.metadata.get("source", "")).stem or "No Title",
-                "content": doc.page_content
-            }
-            for doc in docs
-        ]
-    
-    return _notes_cache
+    global _notes_cache, _cache_dirty
+
+    if _notes_cache is None:
+        _notes_cache = _read_cache_file()
+
+    snapshot = {} if force_reload else _notes_cache
+    cache = {}
+    changed = []
+
+    with os.scandir(vault_path) as entries:
+        for entry in entries:
+            if not entry.name.endswith(".md") or not entry.is_file():
+                continue
+
+            stat = entry.stat()
+            cached = snapshot.get(entry.name)
+
+            if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+                cache[entry.name] = cached
+            else:
+                cache[entry.name] = None
+                changed.append((entry.name, Path(entry.path), stat))
+
+    if changed:
+        with ThreadPoolExecutor(max_workers=min(32, len(changed))) as executor:
+            contents = executor.map(lambda item: item[1].read_text(encoding='utf-8'), changed)
+
+            for (name, _, stat), content in zip(changed, contents):
+                cache[name] = (stat.st_mtime_ns, stat.st_size, name[:-3], content)
+
+    if _cache_dirty or cache != _notes_cache:
+        _write_cache_file(cache)
+    _notes_cache = cache
+    _cache_dirty = False
+
+    return [
+        {"title": title, "content": content}
+        for _, _, title, content in cache.values()
+    ]
+
+def _update_cached_note(note_title: str, new_note_title: str, new_note_content: str) -> None:
+    """Replace a single note's cache entry with content just written to disk"""
+
+    global _cache_dirty
+
+    if _notes_cache is None:
+        return
+
+    name = f"{new_note_title}.md"
+    stat = (vault_path / name).stat()
+
+    _notes_cache.pop(f"{note_title}.md", None)
+    _notes_cache[name] = (stat.st_mtime_ns, stat.st_size, new_note_title, new_note_content)
+    _cache_dirty = True
+
+class _SessionRequests:
+    """Stand-in for the `requests` module that sends Tavily's calls through one keep-alive session"""
+
+    exceptions = requests.exceptions
+
+    def __init__(self, session: requests.Session) -> None:
+        self.get = session.get
+        self.post = session.post
+
+@lru_cache(maxsize=None)
+def get_tavily() -> "TavilyClient":
+    """Create the Tavily client on first search"""
+
+    import tavily.tavily
+    from tavily import TavilyClient
+
+    # TavilyClient calls the module-level requests.post/get, which opens a new connection per search.
+    # Rebinding that module's `requests` keeps the client's error mapping while reusing connections.
+    tavily.tavily.requests = _SessionRequests(requests.Session())
+
+    return TavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
 
 @tool
 def web_search(query: str) -> Dict[str, Any]:
     """Search the web for information"""
 
-    return tavily_client.search(query)
+    return get_tavily().search(query)
 
 @tool
 def inspect_notes() -> List[Dict[str, str]]:
@@ -51,9 +147,8 @@ def inspect_notes() -> List[Dict[str, str]]:
 
     return load_notes()
 
-@tool
-def correct_note(note_title: str, new_note_title: str, new_note_content: str) -> str:
-    """Correct a note."""
+def _apply_correction(note_title: str, new_note_title: str, new_note_content: str) -> str:
+    """Write new content to a note and rename it if the title changed."""
     
     old_path = vault_path / f"{note_title}.md"
     new_path = vault_path / f"{new_note_title}.md"
@@ -61,72 +156,112 @@ def correct_note(note_title: str, new_note_title: str, new_note_content: str) ->
     if not old_path.exists():
         return f"Error: '{note_title}' not found"
     
-    old_path.write_text(new_note_content, encoding='utf-8')
-    
     if note_title != new_note_title:
-        if new_path.exists():
+        try:
+            os.link(old_path, new_path)
+        except FileExistsError:
             return f"Error: '{new_note_title}' already exists"
-        old_path.rename(new_path)
-        load_notes(force_reload=True)
-        return f"Updated and renamed to '{new_note_title}'"
+        except OSError:
+            # No hard-link support (FAT/exFAT, some FUSE mounts): fall back to a checked rename
+            if new_path.exists():
+                return f"Error: '{new_note_title}' already exists"
+            try:
+                old_path.rename(new_path)
+            except OSError as e:
+                return f"Error: could not rename '{note_title}': {e}"
+        else:
+            try:
+                old_path.unlink()
+            except OSError as e:
+                new_path.unlink(missing_ok=True)
+                return f"Error: could not rename '{note_title}': {e}"
+        new_path.write_text(new_note_content, encoding='utf-8')
+        _update_cached_note(note_title, new_note_title, new_note_content)
+        return f"'{note_title}' updated and renamed to '{new_note_title}'"
     
-    load_notes(force_reload=True)
+    old_path.write_text(new_note_content, encoding='utf-8')
+    _update_cached_note(note_title, note_title, new_note_content)
     return f"'{note_title}' updated"
 
+@tool
+def correct_note(note_title: str, new_note_title: str, new_note_content: str) -> str:
+    """Correct a note."""
+
+    return _apply_correction(note_title, new_note_title, new_note_content)
+
+@tool
+def correct_notes_batch(corrections: List[Dict[str, str]]) -> str:
+    """Correct several notes at once. Each item is a {note_title, new_note_title, new_note_content} dict."""
+
+    return "\n".join(
+        _apply_correction(
+            note_title=correction.get('note_title', ''),
+            new_note_title=correction.get('new_note_title') or correction.get('note_title', ''),
+            new_note_content=correction.get('new_note_content', ''),
+        )
+        for correction in corrections
+    )
+
 model.temperature = 0.7
 
 agent = create_agent(
     model=model,
-    tools=[web_search, inspect_notes, correct_note],
+    tools=[web_search, inspect_notes, correct_note, correct_notes_batch],
     middleware=[
         HumanInTheLoopMiddleware(
-            interrupt_on={"correct_note": {"allowed_decisions": ["approve", "reject"]}},
+            interrupt_on={
+                "correct_note": {"allowed_decisions": ["approve", "reject"]},
+                "correct_notes_batch": {"allowed_decisions": ["approve", "reject"]},
+            },
         ),
     ],
-    checkpointer=InMemorySaver(),
+    checkpointer=SessionSaver(),
     system_prompt="""
     Assistant that inspects and corrects personal notes.
     Rules:
     - Use web_search to verify facts (don't rely on your knowledge)
     - Match note length: short stays short, long stays long
     - Only correct if you're confident the info is wrong
-    - MUST use correct_note tool to save changes
-    - If a correction is rejected by the user, SKIP that note and continue with the next one
-    - Do NOT retry the same note multiple times if rejected
+    - Review ALL notes first, then save every change with ONE correct_notes_batch call
+    - Use correct_note only if a single note needs changes
+    - If corrections are rejected by the user, SKIP those notes and finish
+    - Do NOT retry rejected notes
     """.strip()
 )
 
-def get_user_decision(note_title: str, note_content: str, new_note_title: str, new_note_content: str) -> str:
+def get_user_decision(corrections: List[Dict[str, str]]) -> str:
     """Interactive approval prompt"""
     
-    print(f"\n{'='*80}")
-    print(f"CURRENT: {note_title}")
-    print(f"{'='*80}")
-    print(note_content[:200] + "..." if len(note_content) > 200 else note_content)
-    print(f"{'='*80}")
-    print(f"\n{'='*80}")
-    print(f"PROPOSED: {new_note_title}")
-    print(f"{'='*80}")
-    print(new_note_content[:200] + "..." if len(new_note_content) > 200 else new_note_content)
-    print(f"{'='*80}\n")
+    for correction in corrections:
+        note_title = correction.get('note_title', '')
+        new_note_title = correction.get('new_note_title') or note_title
+        new_note_content = correction.get('new_note_content', '')
+        note_path = vault_path / f"{note_title}.md"
+        note_content = note_path.read_text(encoding='utf-8') if note_path.exists() else "[Not found]"
+
+        print(f"\n{BANNER}")
+        print(f"CURRENT: {note_title}")
+        print(f"{BANNER}")
+        print(note_content[:200] + "..." if len(note_content) > 200 else note_content)
+        print(f"{BANNER}")
+        print(f"\n{BANNER}")
+        print(f"PROPOSED: {new_note_title}")
+        print(f"{BANNER}")
+        print(new_note_content[:200] + "..." if len(new_note_content) > 200 else new_note_content)
+        print(f"{BANNER}\n")
     
     print("Options:")
     print("  [a] Approve  - Apply the changes")
-    print("  [r] Reject   - Skip this note and continue")
+    print("  [r] Reject   - Skip these notes and continue")
     
-    while True:
-        decision = input("\nYour decision: ").strip().lower()
-        
-        if decision in ['a', 'approve', 'yes', 'y']:
-            print(f"\nChanges approved, applying...\n")
-            return 'approve'
-        
-        elif decision in ['r', 'reject', 'no', 'n']:
-            print(f"\nChanges rejected, skipping this note...\n")
-            return 'reject'
-        
-        else:
-            print("Invalid input. Please choose: [a]pprove or [r]eject")
+    decision = decide("Invalid input. Please choose: [a]pprove or [r]eject", APPROVE_REJECT)
+
+    if decision == 'approve':
+        print(f"\nChanges approved, applying...\n")
+    else:
+        print(f"\nChanges rejected, skipping...\n")
+
+    return decision
 
 
 def main():
@@ -136,39 +271,37 @@ def main():
 
     print("Starting Obsidian Agent...\n")
 
-    result = agent.invoke(
+    result = stream_agent(
+        agent,
         {"messages": [HumanMessage(content=prompt)]},
         config=config,
+        durability="exit",
     )
     
     while "__interrupt__" in result:
         interrupt_value = result['__interrupt__'][-1].value
         all_requests = interrupt_value['action_requests']
 
-        for i, request in enumerate(all_requests):
+        corrections = []
+        for request in all_requests:
             args = request['args']
-    
-            note_title = args.get('note_title')
-            note_path = vault_path / f"{note_title}.md"
-            note_content = note_path.read_text(encoding='utf-8') if note_path.exists() else "[Not found]"
-
-            decision = get_user_decision(
-                note_title=note_title,
-                note_content=note_content,
-                new_note_title=args.get('new_note_title'),
-                new_note_content=args.get('new_note_content'),
-            )
-            
-            result = agent.invoke(
-                Command(resume={"decisions": [{"type": decision}]}),
-                config=config,
-            )
 
-    print("\nObsidian Agent finished!")
+            if request['name'] == 'correct_notes_batch':
+                corrections.extend(args.get('corrections', []))
+            else:
+                corrections.append(args)
 
-    if result and result["messages"]:
-        print("\n--- Final Result ---")
-        print(result["messages"][-1].content)
+        decision = get_user_decision(corrections)
+        decisions = [{"type": decision} for _ in all_requests]
+        
+        result = stream_agent(
+            agent,
+            Command(resume={"decisions": decisions}),
+            config=config,
+            durability="exit",
+        )
+
+    print("\nObsidian Agent finished!")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,20 @@
+from types import MappingProxyType
+from typing import Mapping
+
+BANNER = "=" * 100
+
+APPROVE_REJECT: Mapping[str, str] = MappingProxyType({
+    'a': 'approve', 'approve': 'approve', 'yes': 'approve', 'y': 'approve',
+    'r': 'reject', 'reject': 'reject', 'no': 'reject', 'n': 'reject',
+})
+
+def decide(invalid_message: str, options: Mapping[str, str]) -> str:
+    """Read input until it matches a key of `options` and return its decision. `invalid_message` is shown on any other input."""
+
+    while True:
+        decision = options.get(input("\nYour decision: ").strip().lower())
+
+        if decision is not None:
+            return decision
+
+        print(invalid_message)
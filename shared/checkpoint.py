@@ -0,0 +1,177 @@
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    copy_checkpoint,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+
+
+class SessionSaver(BaseCheckpointSaver):
+    """Minimal in-process checkpointer for single-user CLI sessions.
+
+    Uses the same per-channel-version blob layout as InMemorySaver: a checkpoint only adds
+    blobs for the channels in `new_versions`. Values and writes are snapshotted with `serde`
+    on save, so later in-place edits (e.g. HITL revising tool calls) cannot alter them.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        # (thread_id, checkpoint_ns) -> [(checkpoint_id, checkpoint, metadata, parent_id), ...] in insertion order
+        self._store: Dict[Tuple[str, str], List[Tuple[str, Checkpoint, CheckpointMetadata, Optional[str]]]] = {}
+        # (thread_id, checkpoint_ns, channel, version) -> serialized value
+        self._blobs: Dict[Tuple[str, str, str, Any], Tuple[str, bytes]] = {}
+        # (thread_id, checkpoint_ns, checkpoint_id) -> {(task_id, idx): (task_id, channel, serialized value)}
+        self._writes: Dict[Tuple[str, str, str], Dict[Tuple[str, int], Tuple[str, str, Tuple[str, bytes]]]] = {}
+
+    def _to_tuple(
+        self,
+        thread_id: str,
+        checkpoint_ns: str,
+        record: Tuple[str, Checkpoint, CheckpointMetadata, Optional[str]],
+    ) -> CheckpointTuple:
+        checkpoint_id, checkpoint, metadata, parent_id = record
+
+        restored = copy_checkpoint(checkpoint)
+        restored["channel_values"] = {
+            channel: self.serde.loads_typed(self._blobs[key])
+            for channel, version in checkpoint["channel_versions"].items()
+            if (key := (thread_id, checkpoint_ns, channel, version)) in self._blobs
+        }
+        writes = self._writes.get((thread_id, checkpoint_ns, checkpoint_id), {})
+
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            },
+            checkpoint=restored,
+            metadata=metadata,
+            pending_writes=[
+                (task_id, channel, self.serde.loads_typed(value))
+                for task_id, channel, value in writes.values()
+            ],
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": parent_id,
+                    }
+                }
+                if parent_id
+                else None
+            ),
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        records = self._store.get((thread_id, checkpoint_ns))
+
+        if not records:
+            return None
+
+        if checkpoint_id := get_checkpoint_id(config):
+            record = next((r for r in reversed(records) if r[0] == checkpoint_id), None)
+            return self._to_tuple(thread_id, checkpoint_ns, record) if record else None
+
+        return self._to_tuple(thread_id, checkpoint_ns, records[-1])
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"] if config else None
+        checkpoint_ns = config["configurable"].get("checkpoint_ns") if config else None
+        checkpoint_id = get_checkpoint_id(config) if config else None
+        before_id = get_checkpoint_id(before) if before else None
+
+        for (thread, ns), records in self._store.items():
+            if thread_id is not None and thread != thread_id:
+                continue
+            if checkpoint_ns is not None and ns != checkpoint_ns:
+                continue
+
+            for record in reversed(records):
+                if checkpoint_id and record[0] != checkpoint_id:
+                    continue
+                if before_id and record[0] >= before_id:
+                    continue
+                if filter and not all(record[2].get(k) == v for k, v in filter.items()):
+                    continue
+                if limit is not None:
+                    if limit <= 0:
+                        return
+                    limit -= 1
+
+                yield self._to_tuple(thread, ns, record)
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        values = checkpoint["channel_values"]
+
+        for channel, version in new_versions.items():
+            if channel in values:
+                self._blobs[(thread_id, checkpoint_ns, channel, version)] = self.serde.dumps_typed(values[channel])
+
+        stored = checkpoint.copy()
+        stored["channel_values"] = {}
+        self._store.setdefault((thread_id, checkpoint_ns), []).append((
+            checkpoint["id"],
+            stored,
+            get_checkpoint_metadata(config, metadata),
+            config["configurable"].get("checkpoint_id"),
+        ))
+
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        stored = self._writes.setdefault((thread_id, checkpoint_ns, checkpoint_id), {})
+
+        for idx, (channel, value) in enumerate(writes):
+            key = (task_id, WRITES_IDX_MAP.get(channel, idx))
+            if key[1] >= 0 and key in stored:
+                continue
+            stored[key] = (task_id, channel, self.serde.dumps_typed(value))
+
+    def delete_thread(self, thread_id: str) -> None:
+        for store in (self._store, self._blobs, self._writes):
+            for key in [k for k in store if k[0] == thread_id]:
+                del store[key]
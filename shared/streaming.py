@@ -0,0 +1,31 @@
+from typing import Any, Dict, List
+
+from langchain_core.messages import AIMessage
+from langgraph.types import Interrupt
+
+
+def stream_agent(agent: Any, input: Any, **kwargs: Any) -> Dict[str, Any]:
+    """Run the agent like `invoke`, printing new AI messages as soon as each step produces them."""
+
+    result: Dict[str, Any] = {}
+    interrupts: List[Interrupt] = []
+    printed = None
+
+    for mode, payload in agent.stream(input, stream_mode=["updates", "values"], **kwargs):
+        if mode == "updates":
+            if isinstance(payload, dict):
+                interrupts.extend(payload.get("__interrupt__", ()))
+            continue
+
+        result = payload
+        messages = payload.get("messages", [])
+
+        if printed is not None:
+            for message in messages[printed:]:
+                if isinstance(message, AIMessage) and message.content:
+                    print(message.content)
+        printed = len(messages)
+
+    if interrupts:
+        return {**result, "__interrupt__": interrupts}
+    return result
@@ -2,29 +2,79 @@ from langchain.agents import create_agent
 from langchain.tools import tool
 from langchain_core.messages import HumanMessage
 from langchain.agents.middleware import HumanInTheLoopMiddleware
-from langgraph.checkpoint.memory import InMemorySaver
-from langchain_community.utilities import SQLDatabase
 from langgraph.runtime import get_runtime
 from langgraph.types import Command
 from dataclasses import dataclass
+from types import MappingProxyType
+from typing import TYPE_CHECKING
+from functools import lru_cache
 import os
 import sys
 import re
 
 sys.path.append(os.path.abspath(os.path.join(os.getcwd(), '.')))
 from config import model
+from shared.approval import APPROVE_REJECT, BANNER, decide
+from shared.checkpoint import SessionSaver
+from shared.streaming import stream_agent
 
+if TYPE_CHECKING:
+    from langchain_community.utilities import SQLDatabase
+    from sqlglot import exp
+    from sqlglot.dialects.dialect import Dialect
 
-db = SQLDatabase.from_uri("sqlite:///Chinook.db")
 
-@dataclass
+@lru_cache(maxsize=None)
+def get_db() -> "SQLDatabase":
+    """Open the Chinook database on first use, on a single shared connection."""
+    from langchain_community.utilities import SQLDatabase
+    from sqlalchemy.pool import StaticPool
+
+    db = SQLDatabase.from_uri(
+        "sqlite:///Chinook.db",
+        engine_args={"connect_args": {"check_same_thread": False}, "poolclass": StaticPool},
+    )
+    db.run("PRAGMA journal_mode=WAL")
+    db.run("PRAGMA synchronous=NORMAL")
+    return db
+
+PREVIEW_LIMIT = 20
+
+@lru_cache(maxsize=None)
+def get_sqlite_dialect() -> "Dialect":
+    """Resolve the sqlglot SQLite dialect once, importing sqlglot on first preview."""
+    from sqlglot.dialects.dialect import Dialect
+    return Dialect.get_or_raise("sqlite")
+
+_WRITE_CMDS = frozenset({'INSERT', 'UPDATE', 'DELETE', 'CREATE', 'DROP', 'ALTER', 'TRUNCATE'})
+_SCHEMA_CMDS = frozenset({'CREATE', 'DROP', 'ALTER'})
+
+_LEADING_KEYWORD_RE = re.compile(r"\s*([A-Za-z]+)")
+
+def _leading_keyword(query: str) -> str:
+    """First word of a query, upper-cased."""
+    match = _LEADING_KEYWORD_RE.match(query)
+    return match.group(1).upper() if match else ''
+
+_DECISION_OPTIONS = MappingProxyType({
+    **APPROVE_REJECT,
+    'v': 'view', 'view': 'view',
+    'p': 'preview', 'preview': 'preview',
+})
+
+@dataclass(frozen=True, slots=True)
 class RuntimeContext:
-    db: SQLDatabase
+    db: "SQLDatabase"
+
+@lru_cache(maxsize=64)
+def _table_info(db: "SQLDatabase", table: str) -> str:
+    """Cached schema description of a table, per database handle."""
+    return db.get_table_info([table])
 
 @tool
 def execute_select_query(query: str) -> str:
     """Execute SELECT queries (read-only)."""
-    if not query.strip().upper().startswith('SELECT'):
+    if _leading_keyword(query) != 'SELECT':
         return "Error: This tool only accepts SELECT queries"
     
     runtime = get_runtime(RuntimeContext)
@@ -38,18 +88,17 @@ def execute_select_query(query: str) -> str:
 @tool
 def execute_write_query(query: str) -> str:
     """Execute INSERT, UPDATE, DELETE, CREATE, DROP, ALTER, TRUNCATE queries (requires approval)."""
-    query_upper = query.strip().upper()
-    allowed = any(query_upper.startswith(cmd) for cmd in [
-        'INSERT', 'UPDATE', 'DELETE', 'CREATE', 'DROP', 'ALTER', 'TRUNCATE'
-    ])
+    command = _leading_keyword(query)
     
-    if not allowed:
+    if command not in _WRITE_CMDS:
         return "Error: This tool only accepts INSERT/UPDATE/DELETE/CREATE/DROP/ALTER/TRUNCATE queries"
     
     runtime = get_runtime(RuntimeContext)
     db = runtime.context.db
     try:
         result = db.run(query)
+        if command in _SCHEMA_CMDS:
+            _table_info.cache_clear()
         return f"Write query executed successfully:\n{result}"
     except Exception as e:
         return f"Error: {e}"
@@ -62,7 +111,7 @@ agent = create_agent(
             interrupt_on={"execute_write_query": {"allowed_decisions": ["approve", "reject"]}},
         ),
     ],
-    checkpointer=InMemorySaver(),
+    checkpointer=SessionSaver(),
     system_prompt="""You are an expert SQL agent that can interact with an SQL database. You have access to two tools:
     1. execute_select_query: Use this tool to run read-only SELECT queries to fetch data from the database.
     2. execute_write_query: Use this tool to run data-modifying queries like INSERT, UPDATE, DELETE, CREATE, DROP, ALTER, and TRUNCATE. 
@@ -70,49 +119,76 @@ agent = create_agent(
     context_schema=RuntimeContext,
 )
 
-def preview_query_impact(query: str, db: SQLDatabase) -> str:
+def _preview_select(parsed: "exp.Expression", *columns: "exp.Expression") -> "exp.Select":
+    """Build a SELECT over the rows a DELETE or UPDATE would touch."""
+    from sqlglot import exp
+
+    select = exp.select(*(columns or ("*",))).from_(parsed.this.copy())
+
+    source = parsed.args.get("from_")
+    if source is not None:
+        select = select.join(source.this.copy())
+
+    for key in ("with_", "where"):
+        if parsed.args.get(key) is not None:
+            select.set(key, parsed.args[key].copy())
+
+    return select
+
+def _describe_impact(parsed: "exp.Expression", db: "SQLDatabase", action: str) -> str:
+    """Count, sample and query plan of the rows a DELETE or UPDATE would touch."""
+    from sqlglot import exp
+
+    dialect = get_sqlite_dialect()
+    count_query = _preview_select(parsed, exp.Count(this=exp.Star())).sql(dialect=dialect)
+    preview_query = _preview_select(parsed).limit(PREVIEW_LIMIT).sql(dialect=dialect)
+
+    count = db.run(count_query, fetch="cursor").scalar()
+    rows = db.run(preview_query)
+    plan = db.run(f"EXPLAIN QUERY PLAN {preview_query}")
+
+    return (
+        f"Rows that will be {action}: {count}\n"
+        f"First {PREVIEW_LIMIT} rows:\n{rows}\n"
+        f"Query plan:\n{plan}"
+    )
+
+def preview_query_impact(query: str, db: "SQLDatabase") -> str:
     """Preview what the query would affect."""
+    import sqlglot
+    from sqlglot import exp
 
-    query_upper = query.strip().upper()
-    
     try:
-        if query_upper.startswith('DELETE'):
-            preview_query = query.replace('DELETE', 'SELECT *', 1)
-            result = db.run(preview_query)
-            return f"Rows that will be deleted:\n{result}"
+        parsed = sqlglot.parse_one(query, dialect=get_sqlite_dialect())
+
+        if isinstance(parsed, exp.Delete):
+            return _describe_impact(parsed, db, "deleted")
         
-        elif query_upper.startswith('UPDATE'):
-            match = re.search(r'UPDATE\s+(\w+)\s+SET.*?(WHERE.*)?', query, re.IGNORECASE | re.DOTALL)
-            if match:
-                table = match.group(1)
-                where = match.group(2) or ''
-                preview_query = f"SELECT * FROM {table} {where}"
-                result = db.run(preview_query)
-                return f"Rows that will be updated:\n{result}"
+        elif isinstance(parsed, exp.Update):
+            return _describe_impact(parsed, db, "updated")
         
-        elif query_upper.startswith('INSERT'):
-            match = re.search(r'INSERT\s+INTO\s+(\w+)', query, re.IGNORECASE)
-            if match:
-                table = match.group(1)
-                info = db.get_table_info([table])
-                return f"Target table structure:\n{info}"
+        elif isinstance(parsed, exp.Insert):
+            target = parsed.this
+            table = target if isinstance(target, exp.Table) else target.this
+            info = _table_info(db, table.name)
+            return f"Target table structure:\n{info}"
         
         return "Preview not available for this operation"
     except Exception as e:
         return f"Could not generate preview: {str(e)}"
 
-def get_user_decision(query: str, db: SQLDatabase) -> str:
+def get_user_decision(query: str, db: "SQLDatabase") -> str:
     """Interactive terminal prompt for approval."""
     
-    print(f"\n{'='*100}")
+    print(f"\n{BANNER}")
     print(f"APPROVAL REQUIRED - WRITE OPERATION")
-    print(f"{'='*100}")
+    print(f"{BANNER}")
     print(f"Query to execute:\n{query}")
-    print(f"{'='*100}")
+    print(f"{BANNER}")
     
     preview = preview_query_impact(query, db)
     print(f"\n{preview}\n")
-    print(f"{'='*100}")
+    print(f"{BANNER}")
     
     print("\nOptions:")
     print("  [a] Approve  - Execute the query")
@@ -121,57 +197,55 @@ def get_user_decision(query: str, db: SQLDatabase) -> str:
     print("  [p] Preview  - Show impact preview again")
     
     while True:
-        decision = input("\nYour decision: ").strip().lower()
+        decision = decide("Invalid input. Please choose: [a]pprove, [r]eject, [v]iew, or [p]review", _DECISION_OPTIONS)
         
-        if decision in ['a', 'approve', 'yes', 'y']:
+        if decision == 'approve':
             print(f"\nQuery approved, executing...\n")
-            return 'approve'
+            return decision
         
-        elif decision in ['r', 'reject', 'no', 'n']:
+        elif decision == 'reject':
             print(f"\nQuery rejected\n")
-            return 'reject'
+            return decision
         
-        elif decision in ['v', 'view']:
+        elif decision == 'view':
             print(f"\nQuery:\n{query}\n")
         
-        elif decision in ['p', 'preview']:
-            print(f"\n{preview}\n")
-        
         else:
-            print("Invalid input. Please choose: [a]pprove, [r]eject, [v]iew, or [p]review")
+            print(f"\n{preview}\n")
 
 
 def main():
 
     prompt = "Please provide me with the names of all artists in the database. Then, add a new artist with name 'AI Records'."
     config = {"configurable": {"thread_id": "1"}}
+    context = RuntimeContext(db=get_db())
 
     print("Starting SQL Agent...\n")
 
-    result = agent.invoke(
+    result = stream_agent(
+        agent,
         {"messages": [HumanMessage(content=prompt)]},
-        context=RuntimeContext(db=db),
+        context=context,
         config=config,
+        durability="exit",
     )
 
     while "__interrupt__" in result:
         action_request = result['__interrupt__'][-1].value['action_requests'][-1]
         query = action_request['args'].get('query', '')
 
-        decision = get_user_decision(query, db)
+        decision = get_user_decision(query, context.db)
         
-        result = agent.invoke(
+        result = stream_agent(
+            agent,
             Command(resume={"decisions": [{"type": decision}]}),
-            context=RuntimeContext(db=db),
+            context=context,
             config=config,
+            durability="exit",
         )
 
     print("\nSQL Agent finished!")
 
-    if result and result["messages"]:
-        print("\n--- Final Result ---")
-        print(result["messages"][-1].content)
-
 
 if __name__ == "__main__":
     main()
\ No newline at end of file